@@ -31,19 +31,26 @@
 
 
 import base64
+import binascii
+import concurrent.futures
+import ctypes
+import ctypes.util
 import getpass
+import hmac as _hmac
 import json
+import os
 import re
 import sys
+from dataclasses import dataclass
+from hashlib import pbkdf2_hmac
+from typing import Union
 
 
 # This script depends on the 'cryptography' package
 # pip install cryptography
 try:
-    from cryptography.hazmat.primitives import hashes, hmac
-    from cryptography.hazmat.primitives.kdf.pbkdf2 import PBKDF2HMAC
+    from cryptography.hazmat.primitives import hashes
     from cryptography.hazmat.primitives.kdf.hkdf import HKDFExpand
-    from cryptography.hazmat.backends import default_backend
     from cryptography.hazmat.primitives.ciphers import Cipher, algorithms, modes
     from cryptography.hazmat.primitives import padding
     from cryptography.hazmat.primitives.asymmetric import rsa, padding as asymmetricpadding
@@ -54,95 +61,174 @@ except ModuleNotFoundError:
     exit(1)
 
 
-def getBitwardenSecrets(email, password, kdfIterations, encKey, encPrivateKey):
-    BitwardenSecrets = {}
-    BitwardenSecrets['email']           = email
-    BitwardenSecrets['kdfIterations']   = kdfIterations
-    BitwardenSecrets['MasterPassword']  = password
-    BitwardenSecrets['ProtectedSymmetricKey'] = encKey
-    BitwardenSecrets['ProtectedRSAPrivateKey'] = encPrivateKey
+# Optional: PyCryptodome has a lighter weight AES-CBC call path.
+# pip install pycryptodome
+try:
+    from Crypto.Cipher import AES as CryptodomeAES
+except ModuleNotFoundError:
+    CryptodomeAES = None
 
-    
-    kdf = PBKDF2HMAC(
-        algorithm=hashes.SHA256(),
-        length=32,
-        salt=bytes(BitwardenSecrets['email'], 'utf-8'),
-        iterations=BitwardenSecrets['kdfIterations'],
-        backend=default_backend()
-        )
-    BitwardenSecrets['MasterKey']       = kdf.derive(BitwardenSecrets['MasterPassword'])
-    BitwardenSecrets['MasterKey_b64']   = base64.b64encode(BitwardenSecrets['MasterKey']).decode('utf-8')
+# Optional: ijson streams data.json so only one encrypted vault group is held in memory at a time.
+# The decrypted output is still built in full before it is printed.
+# pip install ijson
+try:
+    import ijson
+except ModuleNotFoundError:
+    ijson = None
 
 
-    kdf = PBKDF2HMAC(
-        algorithm=hashes.SHA256(),
-        length=32,
-        salt=bytes(BitwardenSecrets['MasterPassword']),
-        iterations=1,
-        backend=default_backend()
-        )
-    BitwardenSecrets['MasterPasswordHash']  = base64.b64encode(kdf.derive(BitwardenSecrets['MasterKey'])).decode('utf-8')
+# data.json top level keys needed before any vault group can be decrypted.
+_HEADER_KEYS    = ("userEmail", "kdfIterations", "encKey", "encPrivateKey", "userId", "encOrgKeys")
+
+_SHA256     = hashes.SHA256()
+_PKCS7      = padding.PKCS7(128)
+
+# Smaller groups are decrypted in-process, starting worker processes costs more than it saves.
+_PARALLEL_MIN_ENTRIES   = 500
+
+# Fewer CipherStrings per key than this are decrypted one at a time instead of as one batch.
+_BATCH_MIN_CIPHERSTRINGS    = 8
+
+# CipherString: encType.iv|ciphertext|mac
+_CIPHER_RE  = re.compile(r"\d\.[A-Za-z0-9+/]+=*\|[A-Za-z0-9+/]+=*\|[A-Za-z0-9+/]+=*")
+
+
+# Use libfastpbkdf2 for the master key derivation if it is installed,
+# otherwise fall back to hashlib (OpenSSL).
+# https://github.com/ctz/fastpbkdf2
+#
+# Note: Offloading to a GPU does not help here. The master key is a single 32 byte PBKDF2 block,
+# so every iteration depends on the previous one and there is nothing to run in parallel.
+try:
+    _fastpbkdf2 = ctypes.CDLL(ctypes.util.find_library("fastpbkdf2") or "libfastpbkdf2.so")
+    _fastpbkdf2.fastpbkdf2_hmac_sha256.restype = None
+    _fastpbkdf2.fastpbkdf2_hmac_sha256.argtypes = [ctypes.c_char_p, ctypes.c_size_t,
+                                                   ctypes.c_char_p, ctypes.c_size_t,
+                                                   ctypes.c_uint32,
+                                                   ctypes.c_char_p, ctypes.c_size_t]
+except (OSError, AttributeError):
+    _fastpbkdf2 = None
+
+
+def _pbkdf2_sha256(password, salt, iterations, dklen):
+    if _fastpbkdf2:
+        out = ctypes.create_string_buffer(dklen)
+        _fastpbkdf2.fastpbkdf2_hmac_sha256(password, len(password), salt, len(salt), iterations, out, dklen)
+        return(out.raw)
+
+    return(pbkdf2_hmac('sha256', password, salt, iterations, dklen))
+
+
+@dataclass
+class BWSecrets:
+    __slots__ = ("email", "MasterKey", "MasterPasswordHash", \
+                 "StretchedEncryptionKey", "StretchedMacKey", \
+                 "GeneratedEncryptionKey", "GeneratedMACKey", \
+                 "RSAPrivateKey", "OrgSecrets")
+
+    email:                  str
+    MasterKey:              bytes
+    MasterPasswordHash:     str     # base64, as sent to the server
+    StretchedEncryptionKey: bytes
+    StretchedMacKey:        bytes
+    GeneratedEncryptionKey: bytes
+    GeneratedMACKey:        bytes
+    RSAPrivateKey:          Union[bytes, str, None]     # None without a private key, str is the MAC error message
+    OrgSecrets:             dict
+
+
+def getBitwardenSecrets(email, password, kdfIterations, encKey, encPrivateKey):
+    masterKey   = _pbkdf2_sha256(password, bytes(email, 'utf-8'), kdfIterations, 32)
+
+    # PBKDF2 with a single iteration and a 32 byte output is just U1 = HMAC(MasterKey, salt || INT(1)).
+    masterPasswordHash  = base64.b64encode(_hmac.digest(masterKey, bytes(password) + b'\x00\x00\x00\x01', 'sha256')).decode('utf-8')
 
 
     hkdf = HKDFExpand(
-        algorithm=hashes.SHA256(),
+        algorithm=_SHA256,
         length=32,
-        info=b"enc",
-        backend=default_backend()
+        info=b"enc"
         )
-    BitwardenSecrets['StretchedEncryptionKey']      = hkdf.derive(BitwardenSecrets['MasterKey'])
-    BitwardenSecrets['StretchedEncryptionKey_b64']  = base64.b64encode(BitwardenSecrets['StretchedEncryptionKey']).decode('utf-8')
+    stretchedEncryptionKey  = hkdf.derive(masterKey)
 
     hkdf = HKDFExpand(
-        algorithm=hashes.SHA256(),
+        algorithm=_SHA256,
         length=32,
-        info=b"mac",
-        backend=default_backend()
+        info=b"mac"
         )
-    BitwardenSecrets['StretchedMacKey']     = hkdf.derive(BitwardenSecrets['MasterKey'])
-    BitwardenSecrets['StretchedMacKey_b64'] = base64.b64encode(BitwardenSecrets['StretchedMacKey']).decode('utf-8')
+    stretchedMacKey         = hkdf.derive(masterKey)
+
+    _, \
+    generatedEncryptionKey, \
+    generatedMACKey         = decryptMasterEncryptionKey(encKey, stretchedEncryptionKey, stretchedMacKey)
+
 
-    BitwardenSecrets['StretchedMasterKey']      = BitwardenSecrets['StretchedEncryptionKey'] + BitwardenSecrets['StretchedMacKey']
-    BitwardenSecrets['StretchedMasterKey_b64']  = base64.b64encode(BitwardenSecrets['StretchedMasterKey']).decode('utf-8')
+    rsaPrivateKey = decryptRSAPrivateKey(encPrivateKey, generatedEncryptionKey, generatedMACKey)
 
-    BitwardenSecrets['GeneratedSymmetricKey'], \
-    BitwardenSecrets['GeneratedEncryptionKey'], \
-    BitwardenSecrets['GeneratedMACKey']             = decryptMasterEncryptionKey(BitwardenSecrets['ProtectedSymmetricKey'], BitwardenSecrets['StretchedEncryptionKey'], BitwardenSecrets['StretchedMacKey'])
-    BitwardenSecrets['GeneratedSymmetricKey_b64']   = base64.b64encode(BitwardenSecrets['GeneratedSymmetricKey']).decode('utf-8')
-    BitwardenSecrets['GeneratedEncryptionKey_b64']  = base64.b64encode(BitwardenSecrets['GeneratedEncryptionKey']).decode('utf-8')
-    BitwardenSecrets['GeneratedMACKey_b64']         = base64.b64encode(BitwardenSecrets['GeneratedMACKey']).decode('utf-8')
+    return(BWSecrets(email, masterKey, masterPasswordHash, \
+                     stretchedEncryptionKey, stretchedMacKey, \
+                     generatedEncryptionKey, generatedMACKey, \
+                     rsaPrivateKey, {}))
 
 
-    BitwardenSecrets['RSAPrivateKey'] = decryptRSAPrivateKey(BitwardenSecrets['ProtectedRSAPrivateKey'], \
-                                                            BitwardenSecrets['GeneratedEncryptionKey'], \
-                                                            BitwardenSecrets['GeneratedMACKey'])
 
-    return(BitwardenSecrets)
+def _aesCbcDecrypt(key, iv, ciphertext):
+    # Returns the still padded plaintext.
+    if CryptodomeAES:
+        return(CryptodomeAES.new(key, CryptodomeAES.MODE_CBC, iv).decrypt(ciphertext))
 
+    decryptor = Cipher(algorithms.AES(key), modes.CBC(iv)).decryptor()
+    return(decryptor.update(ciphertext) + decryptor.finalize())
+
+
+def _aesCbcDecryptBatch(key, ivCiphertexts):
+    # Decrypts a list of [iv, ciphertext] pairs, returns the still padded plaintexts.
+    # A CBC plaintext block is D(C[i]) XOR C[i-1] (the iv for the first block), so all ciphertexts
+    # are decrypted in a single ECB call, which lets AES-NI pipeline the blocks of independent
+    # ciphertexts, then XORed with the iv||ciphertext streams shifted by one block.
+    ciphertexts = b"".join(ciphertext for iv, ciphertext in ivCiphertexts)
+    chaining    = b"".join((iv + ciphertext)[:len(ciphertext)] for iv, ciphertext in ivCiphertexts)
+
+    if CryptodomeAES:
+        decrypted = CryptodomeAES.new(key, CryptodomeAES.MODE_ECB).decrypt(ciphertexts)
+    else:
+        decryptor = Cipher(algorithms.AES(key), modes.ECB()).decryptor()
+        decrypted = decryptor.update(ciphertexts) + decryptor.finalize()
+
+    decrypted = (int.from_bytes(decrypted, 'big') ^ int.from_bytes(chaining, 'big')).to_bytes(len(decrypted), 'big')
+
+    plaintexts = []
+    offset = 0
+    for iv, ciphertext in ivCiphertexts:
+        plaintexts.append(decrypted[offset:offset + len(ciphertext)])
+        offset += len(ciphertext)
+
+    return(plaintexts)
+
+
+def _parseCipherString(CipherString):
+    # CipherString format: encType.iv|ciphertext|mac
+    encType, data           = CipherString.split(".", 1)
+    iv, ciphertext, mac     = data.split("|", 2)
+
+    # binascii.a2b_base64 is what base64.b64decode calls, without the argument checking/conversion.
+    return([int(encType), binascii.a2b_base64(iv), binascii.a2b_base64(ciphertext), binascii.a2b_base64(mac)])
 
 
 def decryptMasterEncryptionKey(CipherString, masterkey, mastermac):
-    encType     = int(CipherString.split(".")[0])   # Not Currently Used, Assuming EncryptionType: 2
-    iv          = base64.b64decode(CipherString.split(".")[1].split("|")[0])
-    ciphertext  = base64.b64decode(CipherString.split(".")[1].split("|")[1])
-    mac         = base64.b64decode(CipherString.split(".")[1].split("|")[2])
+    encType, iv, ciphertext, mac = _parseCipherString(CipherString)   # encType Not Currently Used, Assuming EncryptionType: 2
 
 
     # Calculate CipherString MAC
-    h = hmac.HMAC(mastermac, hashes.SHA256(), backend=default_backend())
-    h.update(iv)
-    h.update(ciphertext)
-    calculatedMAC = h.finalize()
+    calculatedMAC = _hmac.digest(mastermac, iv + ciphertext, 'sha256')
     
-    if mac != calculatedMAC:
+    if not _hmac.compare_digest(mac, calculatedMAC):
         print("ERROR: MAC did not match. Master Encryption Key was not decrypted.")
         exit(1)
 
 
-    unpadder    = padding.PKCS7(128).unpadder()
-    cipher      = Cipher(algorithms.AES(masterkey), modes.CBC(iv), backend=default_backend())
-    decryptor   = cipher.decryptor() 
-    decrypted   = decryptor.update(ciphertext) + decryptor.finalize()
+    unpadder    = _PKCS7.unpadder()
+    decrypted   = _aesCbcDecrypt(masterkey, iv, ciphertext)
 
     try:
         cleartext = unpadder.update(decrypted) + unpadder.finalize()
@@ -163,23 +249,15 @@ def decryptRSAPrivateKey(CipherString, key, mackey):
         return(None)
 
     
-    encType     = int(CipherString.split(".")[0])   # Not Currently Used, Assuming EncryptionType: 2
-    iv          = base64.b64decode(CipherString.split(".")[1].split("|")[0])
-    ciphertext  = base64.b64decode(CipherString.split(".")[1].split("|")[1])
-    mac         = base64.b64decode(CipherString.split(".")[1].split("|")[2])
+    encType, iv, ciphertext, mac = _parseCipherString(CipherString)   # encType Not Currently Used, Assuming EncryptionType: 2
 
 
     # Calculate CipherString MAC
-    h = hmac.HMAC(mackey, hashes.SHA256(), backend=default_backend())
-    h.update(iv)
-    h.update(ciphertext)
-    calculatedMAC = h.finalize()
-
-    if mac == calculatedMAC:       
-        unpadder    = padding.PKCS7(128).unpadder()
-        cipher      = Cipher(algorithms.AES(key), modes.CBC(iv), backend=default_backend())
-        decryptor   = cipher.decryptor() 
-        decrypted   = decryptor.update(ciphertext) + decryptor.finalize()
+    calculatedMAC = _hmac.digest(mackey, iv + ciphertext, 'sha256')
+
+    if _hmac.compare_digest(mac, calculatedMAC):
+        unpadder    = _PKCS7.unpadder()
+        decrypted   = _aesCbcDecrypt(key, iv, ciphertext)
         cleartext   = unpadder.update(decrypted) + unpadder.finalize()
 
         return(cleartext)
@@ -194,23 +272,15 @@ def decryptCipherString(CipherString, key, mackey):
         return(None)
 
     
-    encType     = int(CipherString.split(".")[0])   # Not Currently Used, Assuming EncryptionType: 2
-    iv          = base64.b64decode(CipherString.split(".")[1].split("|")[0])
-    ciphertext  = base64.b64decode(CipherString.split(".")[1].split("|")[1])
-    mac         = base64.b64decode(CipherString.split(".")[1].split("|")[2])
+    encType, iv, ciphertext, mac = _parseCipherString(CipherString)   # encType Not Currently Used, Assuming EncryptionType: 2
 
 
     # Calculate CipherString MAC
-    h = hmac.HMAC(mackey, hashes.SHA256(), backend=default_backend())
-    h.update(iv)
-    h.update(ciphertext)
-    calculatedMAC = h.finalize()
-
-    if mac == calculatedMAC:
-        unpadder    = padding.PKCS7(128).unpadder()
-        cipher      = Cipher(algorithms.AES(key), modes.CBC(iv), backend=default_backend())
-        decryptor   = cipher.decryptor() 
-        decrypted   = decryptor.update(ciphertext) + decryptor.finalize()
+    calculatedMAC = _hmac.digest(mackey, iv + ciphertext, 'sha256')
+
+    if _hmac.compare_digest(mac, calculatedMAC):
+        unpadder    = _PKCS7.unpadder()
+        decrypted   = _aesCbcDecrypt(key, iv, ciphertext)
         cleartext   = unpadder.update(decrypted) + unpadder.finalize()
 
         return(cleartext.decode('utf-8'))
@@ -219,10 +289,40 @@ def decryptCipherString(CipherString, key, mackey):
         return("ERROR: MAC did not match. CipherString not decrypted.")
 
 
+def decryptCipherStrings(CipherStrings, key, mackey):
+    # Same as decryptCipherString for a list of CipherStrings sharing the same key.
+    if len(CipherStrings) < _BATCH_MIN_CIPHERSTRINGS:
+        return([decryptCipherString(CipherString, key, mackey) for CipherString in CipherStrings])
+
+    cleartexts      = [None] * len(CipherStrings)
+    verified        = []
+    ivCiphertexts   = []
+
+    for index, CipherString in enumerate(CipherStrings):
+        encType, iv, ciphertext, mac = _parseCipherString(CipherString)   # encType Not Currently Used, Assuming EncryptionType: 2
+
+        if not _hmac.compare_digest(mac, _hmac.digest(mackey, iv + ciphertext, 'sha256')):
+            cleartexts[index] = "ERROR: MAC did not match. CipherString not decrypted."
+        elif len(iv) != 16 or len(ciphertext) % 16 != 0:
+            # The batch relies on whole blocks and a one block iv, let the CBC path report malformed ones.
+            cleartexts[index] = decryptCipherString(CipherString, key, mackey)
+        else:
+            verified.append(index)
+            ivCiphertexts.append([iv, ciphertext])
+
+    for index, decrypted in zip(verified, _aesCbcDecryptBatch(key, ivCiphertexts)):
+        unpadder    = _PKCS7.unpadder()
+        cleartext   = unpadder.update(decrypted) + unpadder.finalize()
+
+        cleartexts[index] = cleartext.decode('utf-8')
+
+    return(cleartexts)
+
+
 def decryptRSA(CipherString, key):
     encType     = int(CipherString.split(".")[0])   # Not Currently Used, Assuming EncryptionType: 4
     ciphertext  = base64.b64decode(CipherString.split(".")[1].split("|")[0])
-    private_key = load_der_private_key(key, password=None, backend=default_backend())
+    private_key = load_der_private_key(key, password=None)
 
     plaintext = private_key.decrypt(ciphertext, asymmetricpadding.OAEP(mgf=asymmetricpadding.MGF1(algorithm=hashes.SHA1()), \
                                                                         algorithm=hashes.SHA1(), \
@@ -231,13 +331,133 @@ def decryptRSA(CipherString, key):
     return(plaintext)
 
 
+def _findCipherStrings(obj, found):
+    # Walk the parsed entry and add every value that is a CipherString to found (a dict used as an ordered set).
+    # Most leaves are plain strings, check those first and only run the regex on "<digit>." prefixed ones.
+    objType = type(obj)
+
+    if objType is str:
+        if obj[1:2] == "." and _CIPHER_RE.fullmatch(obj):
+            found[obj] = None
+
+    elif objType is dict:
+        for v in obj.values():
+            _findCipherStrings(v, found)
+
+    elif objType is list:
+        for v in obj:
+            _findCipherStrings(v, found)
+
+
+def _decryptObject(obj, cleartexts, userId):
+    # Rebuild the parsed entry with every CipherString replaced by its cleartext.
+    objType = type(obj)
+
+    if objType is str:
+        return(cleartexts.get(obj, obj))
+
+    if objType is dict:
+        # Get rid of the Bitwarden userId key/value pair.
+        return({k: _decryptObject(v, cleartexts, userId) for k, v in obj.items() if not (k == 'userId' and v == userId)})
+
+    if objType is list:
+        return([_decryptObject(v, cleartexts, userId) for v in obj])
+
+    return(obj)
+
+
+def _decryptCipherStringsJob(job):
+    CipherStrings, key, mackey = job
+
+    return(decryptCipherStrings(CipherStrings, key, mackey))
+
+
+def _decryptKeyedCipherStrings(cipherStrings, executor, workers):
+    # cipherStrings maps (encKey, macKey) to the CipherStrings encrypted with that key.
+    # Returns a dict mapping (encKey, macKey) to {CipherString: cleartext}.
+    jobs = []
+
+    if executor:
+        cipherStringCount   = sum(len(keyCipherStrings) for keyCipherStrings in cipherStrings.values())
+        chunkSize           = max(_BATCH_MIN_CIPHERSTRINGS, cipherStringCount // (workers * 4))
+
+    for (encKey, macKey), keyCipherStrings in cipherStrings.items():
+        keyCipherStrings = list(keyCipherStrings)
+
+        if executor:
+            jobs.extend((keyCipherStrings[i:i + chunkSize], encKey, macKey) for i in range(0, len(keyCipherStrings), chunkSize))
+        else:
+            jobs.append((keyCipherStrings, encKey, macKey))
+
+    if executor:
+        jobCleartexts = executor.map(_decryptCipherStringsJob, jobs)
+    else:
+        jobCleartexts = map(_decryptCipherStringsJob, jobs)
+
+    cleartexts = {}
+
+    for (CipherStrings, encKey, macKey), decrypted in zip(jobs, jobCleartexts):
+        cleartexts.setdefault((encKey, macKey), {}).update(zip(CipherStrings, decrypted))
+
+    return(cleartexts)
+
+
+def _streamDataFile(inputfile):
+    with open(inputfile, 'rb') as f:
+        yield from ijson.kvitems(f, '', use_float=True)
+
+
+def _readDataFileHeader(inputfile):
+    # Builds only the _HEADER_KEYS values from the ijson event stream, other values are parsed but not built.
+    # Stops as soon as all of them have been found.
+    datafile = {}
+
+    with open(inputfile, 'rb') as f:
+        events = ijson.parse(f, use_float=True)
+
+        for prefix, event, value in events:
+            if prefix not in _HEADER_KEYS:
+                continue
+
+            key     = prefix
+            builder = ijson.ObjectBuilder()
+            builder.event(event, value)
+            depth   = 1 if event in ('start_map', 'start_array') else 0
+
+            while depth:
+                prefix, event, value = next(events)
+                builder.event(event, value)
+
+                if event in ('start_map', 'start_array'):
+                    depth += 1
+                elif event in ('end_map', 'end_array'):
+                    depth -= 1
+
+            datafile[key] = builder.value
+
+            if len(datafile) == len(_HEADER_KEYS):
+                break
+
+    return(datafile)
+
+
+def _readDataFile(inputfile):
+    # Returns the data.json header values and an iterable of its top level key/value pairs.
+    if not ijson:
+        with open(inputfile) as f:
+            datafile = json.load(f)
+
+        return([datafile, datafile.items()])
+
+    # First pass only reads the (small) header values, the second pass streams the vault groups.
+    return([_readDataFileHeader(inputfile), _streamDataFile(inputfile)])
+
+
 def decryptBitwardenJSON(inputfile):
-    BitwardenSecrets = {}
     decryptedEntries = {}
 
     try:
-        with open(inputfile) as f:
-            datafile = json.load(f)
+        datafile, dataItems = _readDataFile(inputfile)
     except:
         print("ERROR: " + inputfile + " not found.")
         exit(1)
@@ -251,62 +471,72 @@ def decryptBitwardenJSON(inputfile):
     
 
 
-    BitwardenSecrets['OrgSecrets'] = {}
     encOrgKeys = list(datafile["encOrgKeys"])
 
     for i in encOrgKeys:
-        BitwardenSecrets['OrgSecrets'][i] = decryptRSA(datafile["encOrgKeys"][i], BitwardenSecrets['RSAPrivateKey'])
+        BitwardenSecrets.OrgSecrets[i] = decryptRSA(datafile["encOrgKeys"][i], BitwardenSecrets.RSAPrivateKey)
 
     
-    regexPattern = re.compile(r"\d\.[^,]+\|[^,]+=+")
-    
-    for a in datafile:
-
-        if a.startswith('folders_'):
-            group = "folders"
-        elif a.startswith('ciphers_'):
-            group = "items"
-        elif a.startswith('organizations_'):
-            group = "organizations"
-        elif a.startswith('collections_'):
-            group = "collections"
-        else:
-            group = None
+    # CipherStrings are independent, decrypt them in parallel on multi-core machines.
+    # Only the CipherStrings and their symmetric keys are passed to the worker processes.
+    workers     = os.cpu_count() or 1
+    executor    = None
 
-
-        if group:
-            groupData = json.loads(json.dumps(datafile[a]))
-            groupItemsList = []
-    
-            for b in groupData.items():
-                groupEntries = json.loads(json.dumps(b))
-
-                for c in groupEntries:
-                    groupItem = json.loads(json.dumps(c))
-                    
-                    if type(groupItem) is dict:
-                        tempString = json.dumps(c)
-
-                        try:
-                            if (len(groupItem['organizationId'])) > 0:
-                                encKey = BitwardenSecrets['OrgSecrets'][groupItem['organizationId']][0:32]
-                                macKey = BitwardenSecrets['OrgSecrets'][groupItem['organizationId']][32:64]
-                        except Exception:
-                            encKey = BitwardenSecrets['GeneratedEncryptionKey']
-                            macKey = BitwardenSecrets['GeneratedMACKey']
-
-                        for match in regexPattern.findall(tempString):    
-                            jsonEscapedString = json.JSONEncoder().encode(decryptCipherString(match, encKey, macKey))
-                            jsonEscapedString = jsonEscapedString[1:(len(jsonEscapedString)-1)]
-                            tempString = tempString.replace(match, jsonEscapedString)
-
-                            # Get rid of the Bitwarden userId key/value pair.
-                            userIdString = "\"userId\": \"" + datafile["userId"] + "\","
-                            tempString = tempString.replace(userIdString, "")   
-
-                        groupItemsList.append(json.loads(tempString))
-                    
-            decryptedEntries[group] = groupItemsList
+    try:
+        for a, groupData in dataItems:
+
+            if a.startswith('folders_'):
+                group = "folders"
+            elif a.startswith('ciphers_'):
+                group = "items"
+            elif a.startswith('organizations_'):
+                group = "organizations"
+            elif a.startswith('collections_'):
+                group = "collections"
+            else:
+                group = None
+
+
+            if group:
+                entryJobs = []
+        
+                for b in groupData.items():
+                    groupEntries = b
+
+                    for c in groupEntries:
+                        groupItem = c
+                        
+                        if type(groupItem) is dict:
+                            try:
+                                if (len(groupItem['organizationId'])) > 0:
+                                    encKey = BitwardenSecrets.OrgSecrets[groupItem['organizationId']][0:32]
+                                    macKey = BitwardenSecrets.OrgSecrets[groupItem['organizationId']][32:64]
+                            except Exception:
+                                encKey = BitwardenSecrets.GeneratedEncryptionKey
+                                macKey = BitwardenSecrets.GeneratedMACKey
+
+                            entryJobs.append((groupItem, encKey, macKey))
+
+                # Collect the CipherStrings of the whole group per key, so each key is decrypted in large batches.
+                cipherStrings = {}
+
+                for groupItem, encKey, macKey in entryJobs:
+                    _findCipherStrings(groupItem, cipherStrings.setdefault((encKey, macKey), {}))
+
+                if workers > 1 and len(entryJobs) >= _PARALLEL_MIN_ENTRIES:
+                    if not executor:
+                        executor = concurrent.futures.ProcessPoolExecutor(max_workers=workers)
+
+                    cleartexts = _decryptKeyedCipherStrings(cipherStrings, executor, workers)
+                else:
+                    cleartexts = _decryptKeyedCipherStrings(cipherStrings, None, workers)
+
+                decryptedEntries[group] = [_decryptObject(groupItem, cleartexts.get((encKey, macKey), {}), datafile["userId"]) \
+                                           for groupItem, encKey, macKey in entryJobs]
+
+    finally:
+        if executor:
+            executor.shutdown()
 
     return(json.dumps(decryptedEntries, indent=2, ensure_ascii=False))
 